@@ -3,135 +3,115 @@ Tests for the Mergington High School Activities API
 """
 
 import pytest
-from fastapi.testclient import TestClient
-import sys
-from pathlib import Path
-
-# Add src directory to path to import app
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 
 from app import app, activities
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+# Run every test on one session-wide event loop so they can share the client
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
-@pytest.fixture
-def reset_activities():
-    """Reset activities to initial state before each test"""
-    # Store original state
-    original_activities = {
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Basketball": {
-            "description": "Team basketball games and practice sessions",
-            "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
-            "max_participants": 15,
-            "participants": ["alex@mergington.edu"]
-        },
-        "Tennis Club": {
-            "description": "Tennis lessons and friendly matches",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:00 PM",
-            "max_participants": 10,
-            "participants": ["jordan@mergington.edu"]
-        },
-        "Art Studio": {
-            "description": "Painting, drawing, and other visual arts",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 15,
-            "participants": ["isabella@mergington.edu"]
-        },
-        "Music Band": {
-            "description": "Learn instruments and perform in school concerts",
-            "schedule": "Fridays, 3:30 PM - 4:30 PM",
-            "max_participants": 25,
-            "participants": ["lucas@mergington.edu", "ava@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Develop public speaking and critical thinking skills",
-            "schedule": "Mondays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 12,
-            "participants": ["ryan@mergington.edu"]
-        },
-        "Math Club": {
-            "description": "Solve challenging math problems and prepare for competitions",
-            "schedule": "Tuesdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["maya@mergington.edu", "ethan@mergington.edu"]
-        }
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Create a single in-process ASGI client for the FastAPI app, shared by all tests
+
+    ASGITransport does not send lifespan events, so the app's startup and
+    shutdown handlers are run here once around the client's lifetime.
+    """
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            yield c
+
+
+def _copy_activities(source):
+    """Copy an activities dict, duplicating only the mutable participant lists
+
+    Descriptions, schedules and limits are immutable and can be shared.
+    """
+    return {
+        name: {**info, "participants": list(info["participants"])}
+        for name, info in source.items()
     }
-    
-    # Clear and repopulate activities
-    activities.clear()
-    activities.update(original_activities)
-    
-    yield
-    
-    # Reset after test
+
+
+# Initial state of the in-memory activity database, captured at import before
+# any test runs and restored before each test
+_ORIGINAL_ACTIVITIES = _copy_activities(activities)
+
+# URL builders for the signup/unregister endpoints
+SIGNUP_URL = "/activities/{activity}/signup?email={email}".format
+UNREGISTER_URL = "/activities/{activity}/unregister?email={email}".format
+ACTIVITY_ACTION_URL = "/activities/{activity}/{action}?email={email}".format
+
+# Fields every activity returned by GET /activities must provide
+REQUIRED_ACTIVITY_FIELDS = frozenset(
+    {"description", "schedule", "max_participants", "participants"}
+)
+
+
+def _restore_activities():
+    """Replace the app's activities with a fresh copy of the initial state"""
     activities.clear()
-    activities.update(original_activities)
+    activities.update(_copy_activities(_ORIGINAL_ACTIVITIES))
+
+
+@pytest.fixture
+def reset_activities():
+    """Reset activities to initial state before each test
 
+    No teardown is needed: every test requests this fixture or its class-scoped
+    variant, so the next setup overwrites whatever state is left.
+    """
+    _restore_activities()
 
+
+@pytest.fixture(scope="class")
+def reset_activities_readonly():
+    """Reset activities once for a test class whose tests never mutate them"""
+    _restore_activities()
+
+
+@pytest.mark.usefixtures("reset_activities_readonly")
 class TestGetActivities:
     """Tests for GET /activities endpoint"""
     
-    def test_get_activities_returns_all_activities(self, client, reset_activities):
+    async def test_get_activities_returns_all_activities(self, client):
         """Test that GET /activities returns all activities"""
-        response = client.get("/activities")
+        response = await client.get("/activities")
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 9
         assert "Chess Club" in data
         assert "Programming Class" in data
     
-    def test_get_activities_contains_required_fields(self, client, reset_activities):
+    async def test_get_activities_contains_required_fields(self, client):
         """Test that each activity has required fields"""
-        response = client.get("/activities")
+        response = await client.get("/activities")
         data = response.json()
         
-        for activity_name, activity_info in data.items():
-            assert "description" in activity_info
-            assert "schedule" in activity_info
-            assert "max_participants" in activity_info
-            assert "participants" in activity_info
+        for activity_info in data.values():
+            assert REQUIRED_ACTIVITY_FIELDS <= activity_info.keys()
             assert isinstance(activity_info["participants"], list)
     
-    def test_get_activities_chess_club_has_participants(self, client, reset_activities):
+    async def test_get_activities_chess_club_has_participants(self, client):
         """Test that Chess Club has initial participants"""
-        response = client.get("/activities")
+        response = await client.get("/activities")
         data = response.json()
         
-        chess_club = data["Chess Club"]
-        assert len(chess_club["participants"]) == 2
-        assert "michael@mergington.edu" in chess_club["participants"]
-        assert "daniel@mergington.edu" in chess_club["participants"]
+        assert set(data["Chess Club"]["participants"]) == {
+            "michael@mergington.edu",
+            "daniel@mergington.edu",
+        }
 
 
 class TestSignupForActivity:
     """Tests for POST /activities/{activity_name}/signup endpoint"""
     
-    def test_signup_new_participant(self, client, reset_activities):
+    async def test_signup_new_participant(self, client, reset_activities):
         """Test signing up a new participant"""
-        response = client.post(
+        response = await client.post(
             "/activities/Basketball/signup?email=newstudent@mergington.edu"
         )
         assert response.status_code == 200
@@ -139,41 +119,22 @@ class TestSignupForActivity:
         assert "newstudent@mergington.edu" in activities["Basketball"]["participants"]
         assert "Signed up newstudent@mergington.edu for Basketball" in data["message"]
     
-    def test_signup_duplicate_participant_fails(self, client, reset_activities):
+    async def test_signup_duplicate_participant_fails(self, client, reset_activities):
         """Test that signing up a duplicate participant fails"""
         # Try to sign up someone who's already registered
-        response = client.post(
+        response = await client.post(
             "/activities/Chess Club/signup?email=michael@mergington.edu"
         )
         assert response.status_code == 400
-        data = response.json()
-        assert "already signed up" in data["detail"]
-    
-    def test_signup_nonexistent_activity_fails(self, client, reset_activities):
-        """Test that signing up for a nonexistent activity fails"""
-        response = client.post(
-            "/activities/Nonexistent Activity/signup?email=student@mergington.edu"
-        )
-        assert response.status_code == 404
-        data = response.json()
-        assert "Activity not found" in data["detail"]
-    
-    def test_signup_increments_participant_count(self, client, reset_activities):
-        """Test that signup increments participant count"""
-        initial_count = len(activities["Tennis Club"]["participants"])
-        
-        client.post("/activities/Tennis Club/signup?email=newstudent@mergington.edu")
-        
-        final_count = len(activities["Tennis Club"]["participants"])
-        assert final_count == initial_count + 1
+        assert b"already signed up" in response.content
 
 
 class TestUnregisterFromActivity:
     """Tests for POST /activities/{activity_name}/unregister endpoint"""
     
-    def test_unregister_participant(self, client, reset_activities):
+    async def test_unregister_participant(self, client, reset_activities):
         """Test unregistering a participant"""
-        response = client.post(
+        response = await client.post(
             "/activities/Chess Club/unregister?email=michael@mergington.edu"
         )
         assert response.status_code == 200
@@ -181,85 +142,100 @@ class TestUnregisterFromActivity:
         assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
         assert "Unregistered michael@mergington.edu from Chess Club" in data["message"]
     
-    def test_unregister_nonexistent_participant_fails(self, client, reset_activities):
+    async def test_unregister_nonexistent_participant_fails(self, client, reset_activities):
         """Test that unregistering a non-participant fails"""
-        response = client.post(
+        response = await client.post(
             "/activities/Chess Club/unregister?email=notregistered@mergington.edu"
         )
         assert response.status_code == 400
-        data = response.json()
-        assert "not registered" in data["detail"]
-    
-    def test_unregister_from_nonexistent_activity_fails(self, client, reset_activities):
-        """Test that unregistering from a nonexistent activity fails"""
-        response = client.post(
-            "/activities/Nonexistent Activity/unregister?email=student@mergington.edu"
+        assert b"not registered" in response.content
+
+
+class TestSignupAndUnregisterEndpoints:
+    """Tests for behavior shared by the signup and unregister endpoints"""
+    
+    @pytest.mark.parametrize("action", ["signup", "unregister"])
+    async def test_nonexistent_activity_fails(self, client, reset_activities, action):
+        """Test that signing up for or unregistering from a nonexistent activity fails"""
+        response = await client.post(
+            ACTIVITY_ACTION_URL(
+                activity="Nonexistent Activity", action=action, email="student@mergington.edu"
+            )
         )
         assert response.status_code == 404
-        data = response.json()
-        assert "Activity not found" in data["detail"]
-    
-    def test_unregister_decrements_participant_count(self, client, reset_activities):
-        """Test that unregister decrements participant count"""
-        initial_count = len(activities["Chess Club"]["participants"])
+        assert b"Activity not found" in response.content
+    
+    @pytest.mark.parametrize(
+        "action, activity, email, delta",
+        [
+            ("signup", "Tennis Club", "newstudent@mergington.edu", 1),
+            ("unregister", "Chess Club", "michael@mergington.edu", -1),
+        ],
+    )
+    async def test_action_changes_participant_count(
+        self, client, reset_activities, action, activity, email, delta
+    ):
+        """Test that signup increments and unregister decrements participant count"""
+        initial_count = len(activities[activity]["participants"])
         
-        client.post("/activities/Chess Club/unregister?email=michael@mergington.edu")
+        await client.post(ACTIVITY_ACTION_URL(activity=activity, action=action, email=email))
         
-        final_count = len(activities["Chess Club"]["participants"])
-        assert final_count == initial_count - 1
+        final_count = len(activities[activity]["participants"])
+        assert final_count == initial_count + delta
 
 
 class TestSignupAndUnregister:
     """Integration tests for signup and unregister workflows"""
     
-    def test_signup_then_unregister(self, client, reset_activities):
+    async def test_signup_then_unregister(self, client, reset_activities):
         """Test signing up then unregistering"""
         email = "student@mergington.edu"
         activity = "Art Studio"
         
         # Sign up
-        signup_response = client.post(
-            f"/activities/{activity}/signup?email={email}"
+        signup_response = await client.post(
+            SIGNUP_URL(activity=activity, email=email)
         )
         assert signup_response.status_code == 200
         assert email in activities[activity]["participants"]
         
         # Unregister
-        unregister_response = client.post(
-            f"/activities/{activity}/unregister?email={email}"
+        unregister_response = await client.post(
+            UNREGISTER_URL(activity=activity, email=email)
         )
         assert unregister_response.status_code == 200
         assert email not in activities[activity]["participants"]
     
-    def test_signup_multiple_students(self, client, reset_activities):
+    async def test_signup_multiple_students(self, client, reset_activities):
         """Test signing up multiple students"""
         activity = "Basketball"
         emails = ["student1@mergington.edu", "student2@mergington.edu", "student3@mergington.edu"]
         
-        for email in emails:
-            response = client.post(
-                f"/activities/{activity}/signup?email={email}"
-            )
+        signup_urls = [SIGNUP_URL(activity=activity, email=email) for email in emails]
+        
+        for url in signup_urls:
+            response = await client.post(url)
             assert response.status_code == 200
         
         # Verify all are registered
         for email in emails:
             assert email in activities[activity]["participants"]
     
-    def test_cannot_signup_after_unregister_then_signup(self, client, reset_activities):
+    async def test_cannot_signup_after_unregister_then_signup(self, client, reset_activities):
         """Test that a student can unregister and sign up again"""
         email = "student@mergington.edu"
         activity = "Music Band"
+        signup_url = SIGNUP_URL(activity=activity, email=email)
         
         # Sign up
-        client.post(f"/activities/{activity}/signup?email={email}")
+        await client.post(signup_url)
         assert email in activities[activity]["participants"]
         
         # Unregister
-        client.post(f"/activities/{activity}/unregister?email={email}")
+        await client.post(UNREGISTER_URL(activity=activity, email=email))
         assert email not in activities[activity]["participants"]
         
         # Sign up again
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = await client.post(signup_url)
         assert response.status_code == 200
         assert email in activities[activity]["participants"]